@@ -7,25 +7,28 @@ Compares current benchmark results with baseline performance.
 import json
 import sys
 import os
-from typing import Dict, List, Any
-from dataclasses import dataclass
 from pathlib import Path
+import numpy as np
+import pandas as pd
 
-@dataclass
-class BenchmarkResult:
-    name: str
-    value: float
-    unit: str
-    lower_is_better: bool = True
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    orjson = None
 
-@dataclass
-class ComparisonResult:
-    name: str
-    current: float
-    baseline: float
-    change_percent: float
-    regression: bool
-    improvement: bool
+BENCHMARK_COLUMNS = ['name', 'value', 'unit', 'lower_is_better']
+
+def load_benchmark_frame(path: str) -> pd.DataFrame:
+    """Load the 'benchmarks' array of a results file as a DataFrame."""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    data = orjson.loads(raw) if orjson else json.loads(raw)
+    
+    df = pd.DataFrame.from_records(data.get('benchmarks', []), columns=BENCHMARK_COLUMNS)
+    df['lower_is_better'] = df['lower_is_better'].fillna(True).astype(bool)
+    
+    # Later entries win, matching the previous name-keyed dict behaviour
+    return df.drop_duplicates('name', keep='last')
 
 class BenchmarkComparator:
     def __init__(self, baseline_path: str = "baseline_benchmarks.json"):
@@ -33,90 +36,62 @@ class BenchmarkComparator:
         self.regression_threshold = 0.05  # 5% regression threshold
         self.improvement_threshold = 0.05  # 5% improvement threshold
     
-    def load_baseline(self) -> Dict[str, BenchmarkResult]:
+    def load_baseline(self) -> pd.DataFrame:
         """Load baseline benchmark results."""
         if not os.path.exists(self.baseline_path):
             print(f"Warning: Baseline file {self.baseline_path} not found")
-            return {}
-        
-        with open(self.baseline_path, 'r') as f:
-            data = json.load(f)
-        
-        baseline = {}
-        for bench in data.get('benchmarks', []):
-            result = BenchmarkResult(
-                name=bench['name'],
-                value=bench['value'],
-                unit=bench['unit'],
-                lower_is_better=bench.get('lower_is_better', True)
-            )
-            baseline[result.name] = result
+            return pd.DataFrame(columns=BENCHMARK_COLUMNS)
         
-        return baseline
+        return load_benchmark_frame(self.baseline_path)
     
-    def load_current(self, current_path: str) -> Dict[str, BenchmarkResult]:
+    def load_current(self, current_path: str) -> pd.DataFrame:
         """Load current benchmark results."""
-        with open(current_path, 'r') as f:
-            data = json.load(f)
-        
-        current = {}
-        for bench in data.get('benchmarks', []):
-            result = BenchmarkResult(
-                name=bench['name'],
-                value=bench['value'],
-                unit=bench['unit'],
-                lower_is_better=bench.get('lower_is_better', True)
-            )
-            current[result.name] = result
-        
-        return current
+        return load_benchmark_frame(current_path)
     
-    def compare_benchmarks(self, current: Dict[str, BenchmarkResult], 
-                          baseline: Dict[str, BenchmarkResult]) -> List[ComparisonResult]:
-        """Compare current benchmarks with baseline."""
-        comparisons = []
-        
-        for name, current_result in current.items():
-            if name not in baseline:
-                print(f"Warning: No baseline for benchmark '{name}'")
-                continue
-            
-            baseline_result = baseline[name]
-            
-            # Calculate percentage change
-            if baseline_result.value == 0:
-                change_percent = float('inf') if current_result.value > 0 else 0
-            else:
-                change_percent = (current_result.value - baseline_result.value) / baseline_result.value
-            
-            # Determine if this is a regression or improvement
-            if current_result.lower_is_better:
-                regression = change_percent > self.regression_threshold
-                improvement = change_percent < -self.improvement_threshold
-            else:
-                regression = change_percent < -self.regression_threshold
-                improvement = change_percent > self.improvement_threshold
-            
-            comparison = ComparisonResult(
-                name=name,
-                current=current_result.value,
-                baseline=baseline_result.value,
-                change_percent=change_percent * 100,
-                regression=regression,
-                improvement=improvement
+    def compare_benchmarks(self, current: pd.DataFrame, baseline: pd.DataFrame) -> pd.DataFrame:
+        """Compare current benchmarks with baseline.
+        
+        Returns one row per benchmark present in both sets, with columns
+        name, current, baseline, change_percent, regression and improvement.
+        """
+        for name in current.loc[~current['name'].isin(baseline['name']), 'name']:
+            print(f"Warning: No baseline for benchmark '{name}'")
+        
+        merged = current.merge(baseline, on='name', suffixes=('_cur', '_base'))
+        current_values = merged['value_cur'].to_numpy(dtype=float)
+        baseline_values = merged['value_base'].to_numpy(dtype=float)
+        lower_is_better = merged['lower_is_better_cur'].to_numpy(dtype=bool)
+        
+        # Calculate percentage change (a zero baseline maps to inf, or 0 if unchanged)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = np.where(
+                baseline_values == 0,
+                np.where(current_values > 0, np.inf, 0.0),
+                (current_values - baseline_values) / baseline_values
             )
-            
-            comparisons.append(comparison)
         
-        return comparisons
+        # Determine if this is a regression or improvement. Flipping the sign of
+        # higher-is-better metrics lets one pair of comparisons cover both kinds
+        signed_change = np.where(lower_is_better, 1.0, -1.0) * change
+        regression = signed_change > self.regression_threshold
+        improvement = signed_change < -self.improvement_threshold
+        
+        return pd.DataFrame({
+            'name': merged['name'],
+            'current': current_values,
+            'baseline': baseline_values,
+            'change_percent': change * 100,
+            'regression': regression,
+            'improvement': improvement,
+        })
     
-    def generate_report(self, comparisons: List[ComparisonResult]) -> str:
+    def generate_report(self, comparisons: pd.DataFrame) -> str:
         """Generate a human-readable comparison report."""
         report = ["# Benchmark Comparison Report\n"]
         
-        regressions = [c for c in comparisons if c.regression]
-        improvements = [c for c in comparisons if c.improvement]
-        stable = [c for c in comparisons if not c.regression and not c.improvement]
+        regressions = comparisons[comparisons['regression']]
+        improvements = comparisons[comparisons['improvement']]
+        stable = comparisons[~comparisons['regression'] & ~comparisons['improvement']]
         
         report.append(f"## Summary")
         report.append(f"- **Total benchmarks**: {len(comparisons)}")
@@ -124,33 +99,37 @@ class BenchmarkComparator:
         report.append(f"- **Improvements**: {len(improvements)}")
         report.append(f"- **Stable**: {len(stable)}\n")
         
-        if regressions:
-            report.append("## ⚠️ Performance Regressions")
-            for comp in regressions:
-                report.append(f"- **{comp.name}**: {comp.current:.3f} vs {comp.baseline:.3f} "
-                            f"({comp.change_percent:+.1f}%)")
-            report.append("")
-        
-        if improvements:
-            report.append("## ✅ Performance Improvements")
-            for comp in improvements:
-                report.append(f"- **{comp.name}**: {comp.current:.3f} vs {comp.baseline:.3f} "
-                            f"({comp.change_percent:+.1f}%)")
-            report.append("")
-        
-        if stable:
-            report.append("## 📊 Stable Performance")
-            for comp in stable:
-                report.append(f"- **{comp.name}**: {comp.current:.3f} vs {comp.baseline:.3f} "
-                            f"({comp.change_percent:+.1f}%)")
-            report.append("")
+        if not regressions.empty:
+            report.append(self._format_section("## ⚠️ Performance Regressions", regressions))
+        
+        if not improvements.empty:
+            report.append(self._format_section("## ✅ Performance Improvements", improvements))
+        
+        if not stable.empty:
+            report.append(self._format_section("## 📊 Stable Performance", stable))
         
         return "\n".join(report)
     
+    def _format_section(self, heading: str, comparisons: pd.DataFrame) -> str:
+        """Format one report section as a single block of text."""
+        lines = "\n".join(
+            f"- **{comp.name}**: {comp.current:.3f} vs {comp.baseline:.3f} ({comp.change_percent:+.1f}%)"
+            for comp in comparisons.itertuples(index=False)
+        )
+        return f"{heading}\n{lines}\n"
+    
     def save_current_as_baseline(self, current_path: str):
-        """Save current results as new baseline."""
+        """Save current results as new baseline.
+        
+        The baseline is always an independent copy: the results file is rewritten in
+        place on the next benchmark run, and a shared inode would rewrite the baseline
+        with it. The copy is written to a temporary name and renamed over the baseline,
+        which also unlinks a baseline left hard-linked by older versions of this script.
+        """
         import shutil
-        shutil.copy2(current_path, self.baseline_path)
+        tmp_path = f"{self.baseline_path}.tmp"
+        shutil.copyfile(current_path, tmp_path)
+        os.replace(tmp_path, self.baseline_path)
         print(f"Saved current results as new baseline: {self.baseline_path}")
 
 def main():
@@ -167,7 +146,7 @@ def main():
         current = comparator.load_current(current_path)
         baseline = comparator.load_baseline()
         
-        if not baseline:
+        if baseline.empty:
             print("No baseline found. Saving current results as baseline.")
             comparator.save_current_as_baseline(current_path)
             return
@@ -182,9 +161,9 @@ def main():
             f.write(report)
         
         # Check for regressions
-        regressions = [c for c in comparisons if c.regression]
-        if regressions:
-            print(f"\n❌ Found {len(regressions)} performance regressions!")
+        regression_count = int(comparisons['regression'].sum())
+        if regression_count:
+            print(f"\n❌ Found {regression_count} performance regressions!")
             if not update_baseline:
                 sys.exit(1)
         
@@ -7,39 +7,76 @@ import json
 import argparse
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Any, Optional
+import matplotlib
+matplotlib.use('Agg')  # Charts are only written to files; skip interactive backend setup
 import matplotlib.pyplot as plt
 import seaborn as sns
+from cycler import cycler
 import pandas as pd
 import numpy as np
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # ijson is optional; large files are then parsed in one go
+    ijson = None
+
+# Default PNG resolution; plenty for dashboard/CI report viewing
+DEFAULT_DPI = 150
+
+# Chart file format; SVG skips rasterization and PNG compression entirely
+DEFAULT_IMAGE_FORMAT = 'png'
+
+# Result files larger than this are stream-parsed with ijson (when installed) to bound peak memory
+STREAMING_THRESHOLD_BYTES = 64 * 1024 * 1024
+
+JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError) if ijson else (json.JSONDecodeError,)
+
+# Benchmark categories in priority order; a name gets the first category whose pattern matches
+BENCHMARK_CATEGORIES = [
+    ('memory', r'memory|pool|allocation'),
+    ('network', r'packet|network'),
+    ('ecs', r'ecs|entity|component'),
+    ('plugin', r'plugin'),
+    ('tick_rate', r'tick'),
+    ('server', r'server|startup'),
+]
+
 def load_benchmark_results(file_path: str) -> List[Dict[str, Any]]:
     """Load benchmark results from JSON file."""
     try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
+        with open(file_path, 'rb') as f:
+            if ijson and os.fstat(f.fileno()).st_size > STREAMING_THRESHOLD_BYTES:
+                return list(ijson.items(f, 'item', use_float=True))
+            raw = f.read()
+        return orjson.loads(raw) if orjson else json.loads(raw)
     except FileNotFoundError:
         print(f"Warning: Benchmark file {file_path} not found")
         return []
-    except json.JSONDecodeError as e:
+    except JSON_ERRORS as e:
         print(f"Error parsing JSON file {file_path}: {e}")
         return []
 
-def create_performance_comparison_chart(current_data: List[Dict], baseline_data: List[Dict], output_dir: str):
+def create_performance_comparison_chart(current_data: List[Dict], baseline_by_name: Dict[str, Dict], output_dir: str,
+        dpi: int = DEFAULT_DPI, image_format: str = DEFAULT_IMAGE_FORMAT):
     """Create performance comparison chart between current and baseline."""
     
-    # Create baseline lookup
-    baseline_lookup = {item['name']: item['value'] for item in baseline_data}
-    
     # Prepare data for comparison
     comparison_data = []
     for current in current_data:
         name = current['name']
         current_value = current['value']
-        baseline_value = baseline_lookup.get(name)
+        baseline = baseline_by_name.get(name)
         
-        if baseline_value is not None:
+        if baseline is not None:
+            baseline_value = baseline['value']
             # Calculate percentage change
             if baseline_value != 0:
                 change_percent = ((current_value - baseline_value) / baseline_value) * 100
@@ -52,8 +89,7 @@ def create_performance_comparison_chart(current_data: List[Dict], baseline_data:
                 'baseline': baseline_value,
                 'change_percent': change_percent,
                 'unit': current['unit'],
-                'lower_is_better': current['lower_is_better'],
-                'category': categorize_benchmark(name)
+                'lower_is_better': current['lower_is_better']
             })
     
     if not comparison_data:
@@ -61,6 +97,7 @@ def create_performance_comparison_chart(current_data: List[Dict], baseline_data:
         return
     
     df = pd.DataFrame(comparison_data)
+    df['category'] = categorize_benchmarks(df['benchmark'])
     
     # Create performance comparison chart
     plt.figure(figsize=(15, 10))
@@ -68,25 +105,13 @@ def create_performance_comparison_chart(current_data: List[Dict], baseline_data:
     # Sort by change percentage for better visualization
     df_sorted = df.sort_values('change_percent')
     
-    # Color code based on performance change
-    colors = []
-    for _, row in df_sorted.iterrows():
-        if row['lower_is_better']:
-            # For lower-is-better metrics, negative change is good (green), positive is bad (red)
-            if row['change_percent'] < -5:
-                colors.append('green')
-            elif row['change_percent'] > 5:
-                colors.append('red')
-            else:
-                colors.append('orange')
-        else:
-            # For higher-is-better metrics, positive change is good (green), negative is bad (red)
-            if row['change_percent'] > 5:
-                colors.append('green')
-            elif row['change_percent'] < -5:
-                colors.append('red')
-            else:
-                colors.append('orange')
+    # Color code based on performance change. Flip the sign of higher-is-better
+    # metrics so that a negative change is always good (green) and positive bad (red)
+    change_percent = df_sorted['change_percent'].to_numpy()
+    signed_change = np.where(df_sorted['lower_is_better'].to_numpy(dtype=bool),
+                             change_percent, -change_percent)
+    colors = np.where(signed_change < -5, 'green',
+                      np.where(signed_change > 5, 'red', 'orange'))
     
     bars = plt.barh(range(len(df_sorted)), df_sorted['change_percent'], color=colors, alpha=0.7)
     
@@ -98,43 +123,37 @@ def create_performance_comparison_chart(current_data: List[Dict], baseline_data:
     plt.axvline(x=-5, color='red', linestyle='--', alpha=0.5)
     
     # Add value labels on bars
-    for i, (bar, row) in enumerate(zip(bars, df_sorted.itertuples())):
-        width = bar.get_width()
-        plt.text(width + (1 if width >= 0 else -1), bar.get_y() + bar.get_height()/2, 
-                f'{width:.1f}%', ha='left' if width >= 0 else 'right', va='center', fontsize=7)
+    plt.gca().bar_label(bars, fmt='%.1f%%', padding=3, fontsize=7)
     
     plt.legend()
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/performance_comparison.png', dpi=300, bbox_inches='tight')
+    plt.savefig(f'{output_dir}/performance_comparison.{image_format}', dpi=dpi, bbox_inches='tight')
     plt.close()
 
-def create_category_breakdown_chart(data: List[Dict], output_dir: str):
+def create_category_breakdown_chart(data: List[Dict], output_dir: str,
+        dpi: int = DEFAULT_DPI, image_format: str = DEFAULT_IMAGE_FORMAT):
     """Create category breakdown chart."""
     
     # Categorize benchmarks
-    categories = {}
-    for item in data:
-        category = categorize_benchmark(item['name'])
-        if category not in categories:
-            categories[category] = []
-        categories[category].append(item)
+    df = pd.DataFrame(data, columns=['name', 'value'])
+    df['category'] = categorize_benchmarks(df['name'])
+    
+    # Group in order of first appearance, as the charts were laid out before
+    categories = df.groupby('category', sort=False)
     
     # Create subplots for each category
     fig, axes = plt.subplots(2, 3, figsize=(18, 12))
     axes = axes.flatten()
     
-    category_names = list(categories.keys())
-    
-    for i, category in enumerate(category_names[:6]):  # Limit to 6 categories
-        if i >= len(axes):
+    for i, (category, category_data) in enumerate(categories):
+        if i >= len(axes):  # Limit to 6 categories
             break
             
         ax = axes[i]
-        category_data = categories[category]
         
         # Create bar chart for this category
-        names = [item['name'].replace(f'{category}_', '').replace('_', ' ') for item in category_data]
-        values = [item['value'] for item in category_data]
+        names = humanize_benchmark_names(category_data['name'], category)
+        values = category_data['value'].to_numpy()
         
         bars = ax.bar(range(len(names)), values, alpha=0.7)
         ax.set_xticks(range(len(names)))
@@ -143,20 +162,18 @@ def create_category_breakdown_chart(data: List[Dict], output_dir: str):
         ax.set_ylabel('Value')
         
         # Add value labels on bars
-        for bar, value in zip(bars, values):
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{value:.3f}', ha='center', va='bottom', fontsize=7)
+        ax.bar_label(bars, fmt='%.3f', fontsize=7)
     
     # Hide unused subplots
-    for i in range(len(category_names), len(axes)):
+    for i in range(categories.ngroups, len(axes)):
         axes[i].set_visible(False)
     
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/category_breakdown.png', dpi=300, bbox_inches='tight')
+    plt.savefig(f'{output_dir}/category_breakdown.{image_format}', dpi=dpi, bbox_inches='tight')
     plt.close()
 
-def create_performance_trends_chart(data: List[Dict], output_dir: str):
+def create_performance_trends_chart(data: List[Dict], output_dir: str,
+        dpi: int = DEFAULT_DPI, image_format: str = DEFAULT_IMAGE_FORMAT):
     """Create performance trends chart (simulated historical data)."""
     
     # For demonstration, create simulated trend data
@@ -179,18 +196,18 @@ def create_performance_trends_chart(data: List[Dict], output_dir: str):
     # Simulate historical data (in real implementation, load from database)
     dates = pd.date_range(end=pd.Timestamp.now(), periods=30, freq='D')
     
+    # Simulate trend data around each current value in one draw (seeded so charts are reproducible)
+    rng = np.random.default_rng(0)
+    current_values = np.array([item['value'] for item in key_data], dtype=float)[:, np.newaxis]
+    trend_data = rng.normal(current_values, current_values * 0.1, size=(len(key_data), len(dates)))
+    
+    # Add some realistic trend (slight degradation over time)
+    trend_data *= np.linspace(0.95, 1.05, len(dates))
+    
     plt.figure(figsize=(14, 8))
     
-    for item in key_data:
-        # Simulate trend data around current value
-        current_value = item['value']
-        trend_data = np.random.normal(current_value, current_value * 0.1, len(dates))
-        
-        # Add some realistic trend (slight degradation over time)
-        trend_factor = np.linspace(0.95, 1.05, len(dates))
-        trend_data = trend_data * trend_factor
-        
-        plt.plot(dates, trend_data, marker='o', markersize=3, label=item['name'], alpha=0.7)
+    for item, series in zip(key_data, trend_data):
+        plt.plot(dates, series, marker='o', markersize=3, label=item['name'], alpha=0.7)
     
     plt.xlabel('Date')
     plt.ylabel('Performance Value')
@@ -199,25 +216,27 @@ def create_performance_trends_chart(data: List[Dict], output_dir: str):
     plt.xticks(rotation=45)
     plt.grid(True, alpha=0.3)
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/performance_trends.png', dpi=300, bbox_inches='tight')
+    plt.savefig(f'{output_dir}/performance_trends.{image_format}', dpi=dpi, bbox_inches='tight')
     plt.close()
 
-def create_memory_analysis_chart(data: List[Dict], output_dir: str):
+def create_memory_analysis_chart(data: List[Dict], output_dir: str,
+        dpi: int = DEFAULT_DPI, image_format: str = DEFAULT_IMAGE_FORMAT):
     """Create memory-specific analysis chart."""
     
-    memory_benchmarks = [item for item in data if 'memory' in item['name'].lower() or 'pool' in item['name'].lower()]
+    df = pd.DataFrame(data, columns=['name', 'value', 'unit'])
+    memory_benchmarks = df[df['name'].str.lower().str.contains('memory|pool', regex=True)]
     
-    if not memory_benchmarks:
+    if memory_benchmarks.empty:
         print("No memory benchmarks found")
         return
     
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
     
     # Memory efficiency chart
-    efficiency_data = [item for item in memory_benchmarks if 'efficiency' in item['name']]
-    if efficiency_data:
-        names = [item['name'].replace('memory_', '').replace('_', ' ') for item in efficiency_data]
-        values = [item['value'] * 100 for item in efficiency_data]  # Convert to percentage
+    efficiency_data = memory_benchmarks[memory_benchmarks['name'].str.contains('efficiency', regex=False)]
+    if not efficiency_data.empty:
+        names = humanize_benchmark_names(efficiency_data['name'], 'memory')
+        values = efficiency_data['value'] * 100  # Convert to percentage
         
         bars = ax1.bar(names, values, color='skyblue', alpha=0.7)
         ax1.set_title('Memory Pool Efficiency')
@@ -228,59 +247,51 @@ def create_memory_analysis_chart(data: List[Dict], output_dir: str):
         ax1.axhline(y=80, color='green', linestyle='--', alpha=0.7, label='Target (80%)')
         ax1.axhline(y=60, color='orange', linestyle='--', alpha=0.7, label='Warning (60%)')
         
-        for bar, value in zip(bars, values):
-            height = bar.get_height()
-            ax1.text(bar.get_x() + bar.get_width()/2., height + 1,
-                    f'{value:.1f}%', ha='center', va='bottom')
+        ax1.bar_label(bars, fmt='%.1f%%', padding=2)
         
         ax1.legend()
         ax1.tick_params(axis='x', rotation=45)
     
     # Memory allocation performance
-    allocation_data = [item for item in memory_benchmarks if 'allocation' in item['name'] and 'seconds' in item['unit']]
-    if allocation_data:
-        names = [item['name'].replace('memory_', '').replace('_', ' ') for item in allocation_data]
-        values = [item['value'] * 1000 for item in allocation_data]  # Convert to milliseconds
+    allocation_data = memory_benchmarks[memory_benchmarks['name'].str.contains('allocation', regex=False)
+                                        & memory_benchmarks['unit'].str.contains('seconds', regex=False)]
+    if not allocation_data.empty:
+        names = humanize_benchmark_names(allocation_data['name'], 'memory')
+        values = allocation_data['value'] * 1000  # Convert to milliseconds
         
         bars = ax2.bar(names, values, color='lightcoral', alpha=0.7)
         ax2.set_title('Memory Allocation Performance')
         ax2.set_ylabel('Time (ms)')
         
-        for bar, value in zip(bars, values):
-            height = bar.get_height()
-            ax2.text(bar.get_x() + bar.get_width()/2., height + max(values) * 0.01,
-                    f'{value:.2f}ms', ha='center', va='bottom', fontsize=8)
+        ax2.bar_label(bars, fmt='%.2fms', padding=2, fontsize=8)
         
         ax2.tick_params(axis='x', rotation=45)
     
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/memory_analysis.png', dpi=300, bbox_inches='tight')
+    plt.savefig(f'{output_dir}/memory_analysis.{image_format}', dpi=dpi, bbox_inches='tight')
     plt.close()
 
+def categorize_benchmarks(names: pd.Series) -> pd.Series:
+    """Categorize benchmarks by name."""
+    names_lower = names.str.lower()
+    
+    masks = [names_lower.str.contains(pattern, regex=True) for _, pattern in BENCHMARK_CATEGORIES]
+    categories = np.select(masks, [category for category, _ in BENCHMARK_CATEGORIES], default='general')
+    
+    return pd.Series(categories, index=names.index, dtype=object)
+
 def categorize_benchmark(name: str) -> str:
-    """Categorize benchmark by name."""
-    name_lower = name.lower()
-    
-    if 'memory' in name_lower or 'pool' in name_lower or 'allocation' in name_lower:
-        return 'memory'
-    elif 'packet' in name_lower or 'network' in name_lower:
-        return 'network'
-    elif 'ecs' in name_lower or 'entity' in name_lower or 'component' in name_lower:
-        return 'ecs'
-    elif 'plugin' in name_lower:
-        return 'plugin'
-    elif 'tick' in name_lower:
-        return 'tick_rate'
-    elif 'server' in name_lower or 'startup' in name_lower:
-        return 'server'
-    else:
-        return 'general'
+    """Categorize a single benchmark by name."""
+    return categorize_benchmarks(pd.Series([name])).iat[0]
+
+def humanize_benchmark_names(names: pd.Series, prefix: str) -> pd.Series:
+    """Turn benchmark names into chart labels by dropping the chart's own prefix,
+    e.g. 'memory_pool_efficiency' with prefix 'memory' -> 'pool efficiency'."""
+    return names.str.replace(f'{prefix}_', '', regex=False).str.replace('_', ' ', regex=False)
 
-def generate_summary_report(current_data: List[Dict], baseline_data: List[Dict], output_dir: str):
+def generate_summary_report(current_data: List[Dict], baseline_by_name: Dict[str, Dict], output_dir: str):
     """Generate a summary report with key metrics."""
     
-    baseline_lookup = {item['name']: item for item in baseline_data}
-    
     # Key metrics to highlight
     key_metrics = [
         'server_startup_avg',
@@ -296,33 +307,25 @@ def generate_summary_report(current_data: List[Dict], baseline_data: List[Dict],
         f"Total benchmarks: {len(current_data)}\n",
     ]
     
-    if baseline_data:
-        report_lines.append(f"Baseline benchmarks: {len(baseline_data)}\n")
+    if baseline_by_name:
+        report_lines.append(f"Baseline benchmarks: {len(baseline_by_name)}\n")
+        
+        # Calculate summary statistics over benchmarks with a non-zero baseline
+        current_values = np.array([item['value'] for item in current_data], dtype=float)
+        lower_is_better = np.array([item['lower_is_better'] for item in current_data], dtype=bool)
+        baseline_values = np.array([
+            baseline_by_name[item['name']]['value'] if item['name'] in baseline_by_name else np.nan
+            for item in current_data
+        ], dtype=float)
         
-        # Calculate summary statistics
-        regressions = 0
-        improvements = 0
-        stable = 0
+        comparable = ~np.isnan(baseline_values) & (baseline_values != 0)
+        change = (current_values[comparable] - baseline_values[comparable]) / baseline_values[comparable]
         
-        for current in current_data:
-            baseline = baseline_lookup.get(current['name'])
-            if baseline:
-                if baseline['value'] != 0:
-                    change = (current['value'] - baseline['value']) / baseline['value']
-                    if current['lower_is_better']:
-                        if change > 0.05:
-                            regressions += 1
-                        elif change < -0.05:
-                            improvements += 1
-                        else:
-                            stable += 1
-                    else:
-                        if change < -0.05:
-                            regressions += 1
-                        elif change > 0.05:
-                            improvements += 1
-                        else:
-                            stable += 1
+        # Flip higher-is-better changes so that positive always means slower/worse
+        signed_change = np.where(lower_is_better[comparable], change, -change)
+        regressions = int(np.count_nonzero(signed_change > 0.05))
+        improvements = int(np.count_nonzero(signed_change < -0.05))
+        stable = len(signed_change) - regressions - improvements
         
         report_lines.extend([
             f"\n## Performance Changes\n",
@@ -337,7 +340,7 @@ def generate_summary_report(current_data: List[Dict], baseline_data: List[Dict],
     for metric_name in key_metrics:
         current_metric = next((item for item in current_data if item['name'] == metric_name), None)
         if current_metric:
-            baseline_metric = baseline_lookup.get(metric_name)
+            baseline_metric = baseline_by_name.get(metric_name) if baseline_by_name else None
             
             if baseline_metric:
                 change = ((current_metric['value'] - baseline_metric['value']) / baseline_metric['value']) * 100
@@ -351,11 +354,24 @@ def generate_summary_report(current_data: List[Dict], baseline_data: List[Dict],
     with open(f'{output_dir}/summary_report.md', 'w') as f:
         f.writelines(report_lines)
 
+def resolve_chart_style() -> Dict[str, Any]:
+    """Resolve the chart style sheet and palette into a plain rcParams dict."""
+    rc = dict(matplotlib.style.library['seaborn-v0_8'])
+    rc['axes.prop_cycle'] = cycler(color=sns.color_palette("husl"))
+    return rc
+
+def _apply_chart_style(rc: Dict[str, Any]):
+    """Apply the resolved chart style; runs once in each chart worker process."""
+    plt.rcParams.update(rc)
+
 def main():
     parser = argparse.ArgumentParser(description='Generate benchmark comparison charts')
     parser.add_argument('--current', required=True, help='Current benchmark results JSON file')
     parser.add_argument('--baseline', help='Baseline benchmark results JSON file')
     parser.add_argument('--output', default='benchmark_charts', help='Output directory for charts')
+    parser.add_argument('--dpi', type=int, default=DEFAULT_DPI, help='Resolution of the generated PNG charts')
+    parser.add_argument('--format', choices=['png', 'svg'], default=DEFAULT_IMAGE_FORMAT,
+                        help='Image format of the generated charts')
     
     args = parser.parse_args()
     
@@ -374,27 +390,38 @@ def main():
     if baseline_data:
         print(f"Loaded {len(baseline_data)} baseline benchmarks")
     
-    # Set style
-    plt.style.use('seaborn-v0_8')
-    sns.set_palette("husl")
+    # Index the baseline once; the comparison chart and summary both look up by name
+    baseline_by_name = {item['name']: item for item in baseline_data} if baseline_data else {}
+    
+    # Resolve the style once here rather than re-reading the style sheet in every worker
+    chart_style = resolve_chart_style()
     
     try:
-        # Generate charts
-        print("Generating performance comparison chart...")
-        if baseline_data:
-            create_performance_comparison_chart(current_data, baseline_data, args.output)
-        
-        print("Generating category breakdown chart...")
-        create_category_breakdown_chart(current_data, args.output)
-        
-        print("Generating performance trends chart...")
-        create_performance_trends_chart(current_data, args.output)
-        
-        print("Generating memory analysis chart...")
-        create_memory_analysis_chart(current_data, args.output)
-        
-        print("Generating summary report...")
-        generate_summary_report(current_data, baseline_data, args.output)
+        # Charts are independent and CPU-bound, so render them in parallel worker processes
+        with ProcessPoolExecutor(max_workers=4, initializer=_apply_chart_style,
+                                 initargs=(chart_style,)) as executor:
+            futures = []
+            
+            print("Generating performance comparison chart...")
+            if baseline_by_name:
+                futures.append(executor.submit(
+                    create_performance_comparison_chart, current_data, baseline_by_name, args.output, args.dpi, args.format))
+            
+            print("Generating category breakdown chart...")
+            futures.append(executor.submit(create_category_breakdown_chart, current_data, args.output, args.dpi, args.format))
+            
+            print("Generating performance trends chart...")
+            futures.append(executor.submit(create_performance_trends_chart, current_data, args.output, args.dpi, args.format))
+            
+            print("Generating memory analysis chart...")
+            futures.append(executor.submit(create_memory_analysis_chart, current_data, args.output, args.dpi, args.format))
+            
+            print("Generating summary report...")
+            generate_summary_report(current_data, baseline_by_name, args.output)
+            
+            # Re-raise any error from a worker
+            for future in futures:
+                future.result()
         
         print(f"✅ Charts generated successfully in {args.output}/")
         
@@ -10,12 +10,22 @@ import json
 import time
 import argparse
 import sys
-from typing import List, Dict, Any
+from typing import Dict, Any
 from dataclasses import dataclass, asdict
-from concurrent.futures import ThreadPoolExecutor
-import statistics
+import numpy as np
 
-@dataclass
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib json module
+    orjson = None
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+def _encode_json(obj) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes, using orjson when it is installed."""
+    return orjson.dumps(obj) if orjson else json.dumps(obj).encode('utf-8')
+
+@dataclass(slots=True)
 class ConnectionResult:
     connection_id: int
     connect_time: float
@@ -25,7 +35,7 @@ class ConnectionResult:
     errors: int
     success: bool
 
-@dataclass
+@dataclass(slots=True)
 class LoadTestResults:
     total_connections: int
     successful_connections: int
@@ -41,11 +51,21 @@ class MinecraftLoadTester:
     def __init__(self, host: str = "localhost", port: int = 19132):
         self.host = host
         self.port = port
-        self.results: List[ConnectionResult] = []
+        # The simulated traffic goes to the server's HTTP endpoint; built once, not per packet
+        self._health_url = f"http://{host}:8080/health"
+        self._packet_url = f"http://{host}:8080/packet"
     
-    async def simulate_bedrock_connection(self, connection_id: int, duration: int) -> ConnectionResult:
-        """Simulate a Bedrock client connection."""
-        start_time = time.time()
+    async def simulate_bedrock_connection(self, connection_id: int, duration: int,
+                                          session: aiohttp.ClientSession,
+                                          handshake_slots: asyncio.Semaphore,
+                                          packet_interval: float = 0.1) -> ConnectionResult:
+        """Simulate a Bedrock client connection sending one packet every packet_interval seconds.
+        
+        The handshake runs while holding one of handshake_slots; all requests go through session.
+        """
+        # Durations use the event loop's monotonic clock; wall-clock time is only for packet timestamps
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
         connect_time = 0
         packets_sent = 0
         packets_received = 0
@@ -53,57 +73,66 @@ class MinecraftLoadTester:
         success = False
         
         try:
-            # Simulate RakNet handshake
-            connect_start = time.time()
-            
             # In a real implementation, this would use actual RakNet protocol
             # For now, we'll simulate with HTTP requests to test the server
-            async with aiohttp.ClientSession() as session:
-                # Simulate connection establishment
-                try:
-                    async with session.get(f"http://{self.host}:8080/health") as response:
+            # Simulate connection establishment (RakNet handshake); only the handshake
+            # is throttled, established connections run concurrently without limit
+            try:
+                async with handshake_slots:
+                    connect_start = loop.time()
+                    async with session.get(self._health_url) as response:
                         if response.status == 200:
-                            connect_time = time.time() - connect_start
+                            connect_time = loop.time() - connect_start
                             success = True
-                except Exception as e:
-                    errors += 1
-                    print(f"Connection {connection_id} failed to connect: {e}")
-                
-                if success:
-                    # Simulate packet exchange
-                    end_time = start_time + duration
-                    while time.time() < end_time and errors < 10:
-                        try:
-                            # Simulate sending packets
-                            packet_data = {
-                                "type": "keep_alive",
-                                "timestamp": time.time(),
-                                "connection_id": connection_id
-                            }
-                            
-                            async with session.post(
-                                f"http://{self.host}:8080/packet",
-                                json=packet_data
-                            ) as response:
-                                if response.status == 200:
-                                    packets_sent += 1
-                                    packets_received += 1
-                                else:
-                                    errors += 1
-                            
-                            # Wait between packets
-                            await asyncio.sleep(0.1)
-                            
-                        except Exception as e:
-                            errors += 1
-                            if errors >= 10:
-                                break
-        
+            except Exception as e:
+                errors += 1
+                print(f"Connection {connection_id} failed to connect: {e}")
+            
+            if success:
+                # Simulate packet exchange; the packet is built once and only its timestamp changes
+                end_time = start_time + duration
+                packet_data = {
+                    "type": "keep_alive",
+                    "timestamp": 0.0,
+                    "connection_id": connection_id
+                }
+                # Packets are paced against absolute deadlines so slow responses do not
+                # accumulate drift the way a fixed sleep after every send would
+                next_tick = loop.time() + packet_interval
+                while loop.time() < end_time and errors < 10:
+                    try:
+                        # Simulate sending packets
+                        packet_data["timestamp"] = time.time()
+                        
+                        async with session.post(
+                            self._packet_url,
+                            data=_encode_json(packet_data),
+                            headers=_JSON_HEADERS
+                        ) as response:
+                            if response.status == 200:
+                                packets_sent += 1
+                                packets_received += 1
+                            else:
+                                errors += 1
+                        
+                        # Wait until the next packet is due
+                        await asyncio.sleep(max(0.0, next_tick - loop.time()))
+                        # Ticks missed during a slow response are skipped rather than sent
+                        # back to back, so a struggling server never gets a catch-up burst
+                        next_tick += packet_interval
+                        if next_tick < loop.time():
+                            next_tick = loop.time() + packet_interval
+                        
+                    except Exception as e:
+                        errors += 1
+                        if errors >= 10:
+                            break
+    
         except Exception as e:
             errors += 1
             print(f"Connection {connection_id} encountered error: {e}")
         
-        total_time = time.time() - start_time
+        total_time = loop.time() - start_time
         
         return ConnectionResult(
             connection_id=connection_id,
@@ -115,49 +144,80 @@ class MinecraftLoadTester:
             success=success and errors < 10
         )
     
-    async def run_load_test(self, num_connections: int, duration: int) -> LoadTestResults:
-        """Run the load test with specified parameters."""
+    async def run_load_test(self, num_connections: int, duration: int,
+                            ramp_concurrency: int = 50, packet_rate: float = 10.0) -> LoadTestResults:
+        """Run the load test with specified parameters.
+        
+        At most ramp_concurrency connections perform their handshake at the same time,
+        and each connection sends packet_rate packets per second once established.
+        """
         print(f"Starting load test: {num_connections} connections for {duration} seconds")
         
-        start_time = time.time()
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
         
-        # Create connection tasks
-        tasks = []
-        for i in range(num_connections):
-            task = asyncio.create_task(
-                self.simulate_bedrock_connection(i, duration)
-            )
-            tasks.append(task)
+        # One pooled session for every simulated client, sized to keep all connections alive
+        connector = aiohttp.TCPConnector(limit=num_connections, limit_per_host=num_connections,
+                                         keepalive_timeout=60)
+        # All simulated clients share it so TCP connections are pooled and reused
+        async with aiohttp.ClientSession(connector=connector) as session:
+            # Bound in-flight handshakes instead of staggering task creation, so the
+            # ramp-up does not grow linearly with the number of connections
+            handshake_slots = asyncio.Semaphore(ramp_concurrency)
             
-            # Stagger connection attempts to avoid overwhelming the server
-            if i % 10 == 0 and i > 0:
-                await asyncio.sleep(0.1)
-        
-        # Wait for all connections to complete
-        self.results = await asyncio.gather(*tasks, return_exceptions=True)
+            # Create connection tasks
+            packet_interval = 1.0 / packet_rate
+            tasks = [
+                asyncio.create_task(self.simulate_bedrock_connection(i, duration, session, handshake_slots,
+                                                                 packet_interval))
+                for i in range(num_connections)
+            ]
+            
+            # Write each result into flat per-field arrays as its connection finishes,
+            # instead of collecting every result object first
+            success = np.zeros(num_connections, dtype=bool)
+            connect_times = np.empty(num_connections, dtype=np.float64)
+            total_times = np.empty(num_connections, dtype=np.float64)
+            packets_sent = np.empty(num_connections, dtype=np.int64)
+            errors = np.empty(num_connections, dtype=np.int64)
+            
+            count = 0
+            for fut in asyncio.as_completed(tasks):
+                try:
+                    result = await fut
+                except Exception:
+                    # Connections that crashed outright are left out of the statistics
+                    continue
+                success[count] = result.success
+                connect_times[count] = result.connect_time
+                total_times[count] = result.total_time
+                packets_sent[count] = result.packets_sent
+                errors[count] = result.errors
+                count += 1
         
-        # Filter out exceptions
-        valid_results = [r for r in self.results if isinstance(r, ConnectionResult)]
+        total_duration = loop.time() - start_time
         
-        total_duration = time.time() - start_time
+        success = success[:count]
+        connect_times = connect_times[:count]
+        total_times = total_times[:count]
+        packets_sent = packets_sent[:count]
+        errors = errors[:count]
         
-        # Calculate statistics
-        successful = [r for r in valid_results if r.success]
-        failed = [r for r in valid_results if not r.success]
+        successful = int(np.count_nonzero(success))
         
-        avg_connect_time = statistics.mean([r.connect_time for r in successful]) if successful else 0
-        avg_response_time = statistics.mean([r.total_time for r in successful]) if successful else 0
+        avg_connect_time = float(connect_times[success].mean()) if successful else 0
+        avg_response_time = float(total_times[success].mean()) if successful else 0
         
-        total_packets = sum(r.packets_sent for r in valid_results)
+        total_packets = int(packets_sent.sum())
         packets_per_second = total_packets / total_duration if total_duration > 0 else 0
         
-        total_errors = sum(r.errors for r in valid_results)
+        total_errors = int(errors.sum())
         errors_per_second = total_errors / total_duration if total_duration > 0 else 0
         
         return LoadTestResults(
-            total_connections=len(valid_results),
-            successful_connections=len(successful),
-            failed_connections=len(failed),
+            total_connections=count,
+            successful_connections=successful,
+            failed_connections=count - successful,
             total_duration=total_duration,
             avg_connect_time=avg_connect_time,
             avg_response_time=avg_response_time,
@@ -216,15 +276,26 @@ async def main():
     parser.add_argument("--port", type=int, default=19132, help="Server port")
     parser.add_argument("--connections", type=int, default=100, help="Number of concurrent connections")
     parser.add_argument("--duration", type=int, default=60, help="Test duration in seconds")
+    parser.add_argument("--ramp-concurrency", type=int, default=50,
+                        help="Maximum number of connection handshakes in flight at once")
+    parser.add_argument("--packet-rate", type=float, default=10.0,
+                        help="Packets per second sent by each connection")
     parser.add_argument("--output", default="load_test_results.json", help="Output file for results")
     
     args = parser.parse_args()
+    if args.ramp_concurrency < 1:
+        # A zero-slot semaphore would block every handshake forever
+        parser.error("--ramp-concurrency must be at least 1")
+    if not 0 < args.packet_rate < float("inf"):
+        # The packet interval is 1 / packet_rate and has to be a positive, finite delay
+        parser.error("--packet-rate must be a positive number")
     
     tester = MinecraftLoadTester(args.host, args.port)
     
     try:
         print("Starting load test...")
-        results = await tester.run_load_test(args.connections, args.duration)
+        results = await tester.run_load_test(args.connections, args.duration, args.ramp_concurrency,
+                                             args.packet_rate)
         
         # Generate and display report
         report = tester.generate_report(results)